@@ -1,11 +1,12 @@
 import base64
+import http.client
 import logging
 import os
 import unittest
 
-from urllib.parse import urlencode, urlunsplit
-from urllib.request import Request as BaseRequest
-from urllib.request import urlopen
+from io import BytesIO
+from urllib.error import HTTPError
+from urllib.parse import urlencode, urljoin, urlsplit, urlunsplit
 
 import httpx
 import pytest
@@ -20,28 +21,6 @@ here = os.path.dirname(__file__)
 doc_root = os.path.join(here, "docroot")
 
 
-class Request(BaseRequest):
-    def __init__(self, *args, **kwargs):
-        BaseRequest.__init__(self, *args, **kwargs)
-        self.method = "GET"
-
-    def get_method(self):
-        return self.method
-
-    def add_data(self, data):
-        if hasattr(data, "items"):
-            data = urlencode(data).encode("ascii")
-
-        assert isinstance(data, bytes)
-
-        if hasattr(BaseRequest, "add_data"):
-            BaseRequest.add_data(self, data)
-        else:
-            self.data = data
-
-        self.add_header("Content-Length", str(len(data)))
-
-
 class TestUsingServer(unittest.TestCase):
     def setUp(self):
         self.server = wptserve.server.WebTestHttpd(host="localhost",
@@ -50,33 +29,99 @@ class TestUsingServer(unittest.TestCase):
                                                    certificate=None,
                                                    doc_root=doc_root)
         self.server.start()
+        # A single keep-alive connection, reused for every request the test
+        # makes rather than paying a TCP handshake per request
+        self._conn = http.client.HTTPConnection(self.server.host, self.server.port)
+        self._last_resp = None
 
     def tearDown(self):
+        self._conn.close()
         self.server.stop()
 
     def abs_url(self, path, query=None):
         return urlunsplit(("http", "%s:%i" % (self.server.host, self.server.port), path, query, None))
 
     def request(self, path, query=None, method="GET", headers=None, body=None, auth=None):
-        req = Request(self.abs_url(path, query))
-        req.method = method
-        if headers is None:
-            headers = {}
+        """Make a request over the persistent connection.
 
-        for name, value in headers.items():
-            req.add_header(name, value)
+        The returned object matches the interface urlopen used to provide
+        here (getcode(), info(), msg, read()), and an HTTPError is raised
+        for 4xx/5xx responses just as urlopen would."""
+        url = self.abs_url(path, query)
+        headers = {} if headers is None else dict(headers)
 
-        if body is not None:
-            req.add_data(body)
+        if body is not None and hasattr(body, "items"):
+            body = urlencode(body).encode("ascii")
 
         if auth is not None:
-            req.add_header("Authorization", b"Basic %s" % base64.b64encode(b"%s:%s" % auth))
-
-        return urlopen(req)
+            headers["Authorization"] = b"Basic %s" % base64.b64encode(b"%s:%s" % auth)
+
+        target = path if path.startswith("/") else "/" + path
+        if query is not None:
+            target += "?" + query
+
+        self._drain_last_response()
+
+        for _ in range(5):
+            try:
+                self._conn.request(method, target, body=body, headers=headers)
+                resp = self._conn.getresponse()
+            except ConnectionError:
+                # The server closed the keep-alive connection; retry on a
+                # fresh one
+                self._conn.close()
+                self._conn.request(method, target, body=body, headers=headers)
+                resp = self._conn.getresponse()
+            if resp.status in (301, 302, 303, 307, 308) and "Location" in resp.headers:
+                # Drain the redirect so the connection can be reused to
+                # follow it
+                resp.read()
+                url = urljoin(url, resp.headers["Location"])
+                parts = urlsplit(url)
+                target = parts.path
+                if parts.query:
+                    target += "?" + parts.query
+                if resp.status in (301, 302, 303):
+                    method = "GET"
+                    body = None
+                continue
+            break
+
+        if resp.status >= 400:
+            raise HTTPError(url, resp.status, resp.reason, resp.headers,
+                            BytesIO(resp.read()))
+
+        resp.url = url
+        resp.msg = resp.reason
+        self._last_resp = resp
+        return resp
+
+    def _drain_last_response(self):
+        """Read any unconsumed body of the previous response, which must be
+        done before the connection can be reused."""
+        if self._last_resp is not None:
+            try:
+                self._last_resp.read()
+            except (OSError, http.client.HTTPException):
+                self._conn.close()
+            self._last_resp = None
 
     def assert_multiple_headers(self, resp, name, values):
         assert resp.info().get_all(name) == values
 
+    def assert_http_error_code(self, code, fn):
+        """Assert that calling fn raises an HTTPError with the given code.
+
+        Unlike pytest.raises used with `as`, this doesn't construct an
+        ExceptionInfo and so doesn't retain the traceback (with its frame
+        locals) beyond the assertion."""
+        try:
+            fn()
+        except HTTPError as e:
+            assert e.code == code
+        else:
+            raise AssertionError("expected HTTPError %i" % code)
+
 
 @pytest.mark.skipif(not wptserve.utils.http2_compatible(), reason="h2 server requires OpenSSL 1.0.2+")
 class TestUsingH2Server:
@@ -102,30 +147,34 @@ class TestUsingH2Server:
 class TestWrapperHandlerUsingServer(TestUsingServer):
     '''For a wrapper handler, a .js dummy testing file is requried to render
     the html file. This class extends the TestUsingServer and do some some
-    extra work: it tries to generate the dummy .js file in setUp and
-    remove it in tearDown.'''
+    extra work: it tries to generate the dummy .js file in setUpClass and
+    remove it in tearDownClass. The dummy files are the same for every test
+    in a class, so they are only written to disk once per class.'''
     dummy_files = {}
 
-    def gen_file(self, filename, empty=True, content=b''):
-        self.remove_file(filename)
+    @classmethod
+    def gen_file(cls, filename, empty=True, content=b''):
+        cls.remove_file(filename)
 
         with open(filename, 'wb') as fp:
             if not empty:
                 fp.write(content)
 
-    def remove_file(self, filename):
+    @classmethod
+    def remove_file(cls, filename):
         if os.path.exists(filename):
             os.remove(filename)
 
-    def setUp(self):
-        super().setUp()
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
 
-        for filename, content in self.dummy_files.items():
+        for filename, content in cls.dummy_files.items():
             filepath = os.path.join(doc_root, filename)
             if content == '':
-                self.gen_file(filepath)
+                cls.gen_file(filepath)
             else:
-                self.gen_file(filepath, False, content)
+                cls.gen_file(filepath, False, content)
 
     def run_wrapper_test(self, req_file, content_type, wrapper_handler,
                          headers=None):
@@ -141,9 +190,10 @@ class TestWrapperHandlerUsingServer(TestUsingServer):
         with open(os.path.join(doc_root, req_file), 'rb') as fp:
             self.assertEqual(fp.read(), resp.read())
 
-    def tearDown(self):
-        super().tearDown()
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
 
-        for filename, _ in self.dummy_files.items():
+        for filename, _ in cls.dummy_files.items():
             filepath = os.path.join(doc_root, filename)
-            self.remove_file(filepath)
+            cls.remove_file(filepath)
@@ -28,7 +28,10 @@ class TestResponse(TestUsingServer):
 
         route = ("GET", "/test/test_head_without_body", handler)
         self.server.router.register(*route)
-        resp = self.request(route[1], method="HEAD")
+        # The response ends mid-headers, so it is only delimited by the
+        # server closing the connection
+        resp = self.request(route[1], method="HEAD",
+                            headers={"Connection": "close"})
         self.assertEqual("6", resp.info()['Content-Length'])
         self.assertEqual("TEST", resp.info()['x-Test'])
         self.assertEqual("", resp.info()['x-body'])
@@ -43,7 +46,8 @@ class TestResponse(TestUsingServer):
 
         route = ("GET", "/test/test_head_with_body", handler)
         self.server.router.register(*route)
-        resp = self.request(route[1], method="HEAD")
+        resp = self.request(route[1], method="HEAD",
+                            headers={"Connection": "close"})
         self.assertEqual("6", resp.info()['Content-Length'])
         self.assertEqual("TEST", resp.info()['x-Test'])
         self.assertEqual("body", resp.info()['X-Body'])
@@ -178,7 +182,9 @@ class TestResponse(TestUsingServer):
         self.server.router.register(*route)
 
         with pytest.raises(BadStatusLine) as e:
-            self.request(route[1])
+            # The raw content has no newline, so it can only be delimited
+            # by the server closing the connection
+            self.request(route[1], headers={"Connection": "close"})
         assert str(e.value) == resp_content.decode('utf-8')
 
 class TestH2Response(TestUsingH2Server):
@@ -10,7 +10,7 @@ from .constants import content_types
 from .pipes import Pipeline, template
 from .ranges import RangeParser
 from .request import Authentication
-from .response import MultipartContent
+from .response import FileSlice, MultipartContent
 from .utils import HTTPException
 
 from html import escape
@@ -239,25 +239,30 @@ class FileHandler:
         return rv
 
     def get_data(self, response, path, byte_ranges):
-        """Return either the handle to a file, or a string containing
-        the content of a chunk of the file, if we have a range request."""
+        """Return either the handle to a file, or a FileSlice exposing
+        the requested chunk of the file, if we have a range request."""
         if byte_ranges is None:
             return open(path, 'rb')
+        # Leave the file open so that the ranges can be sent with
+        # os.sendfile() rather than read into memory; all the parts of a
+        # multipart response share the single file handle, which is closed
+        # with the last part
+        f = open(path, 'rb')
+        response.status = 206
+        if len(byte_ranges) > 1:
+            parts_content_type, content = self.set_response_multipart(response,
+                                                                      byte_ranges,
+                                                                      f)
+            for i, byte_range in enumerate(byte_ranges):
+                data = FileSlice(f, byte_range.lower, byte_range.upper,
+                                 close_file=(i == len(byte_ranges) - 1))
+                content.append_part(data,
+                                    parts_content_type,
+                                    [("Content-Range", byte_range.header_value())])
+            return content
         else:
-            with open(path, 'rb') as f:
-                response.status = 206
-                if len(byte_ranges) > 1:
-                    parts_content_type, content = self.set_response_multipart(response,
-                                                                              byte_ranges,
-                                                                              f)
-                    for byte_range in byte_ranges:
-                        content.append_part(self.get_range_data(f, byte_range),
-                                            parts_content_type,
-                                            [("Content-Range", byte_range.header_value())])
-                    return content
-                else:
-                    response.headers.set("Content-Range", byte_ranges[0].header_value())
-                    return self.get_range_data(f, byte_ranges[0])
+            response.headers.set("Content-Range", byte_ranges[0].header_value())
+            return FileSlice(f, byte_ranges[0].lower, byte_ranges[0].upper)
 
     def set_response_multipart(self, response, ranges, f):
         parts_content_type = response.headers.get("Content-Type")
@@ -269,10 +274,6 @@ class FileHandler:
         response.headers.set("Content-Type", "multipart/byteranges; boundary=%s" % content.boundary)
         return parts_content_type, content
 
-    def get_range_data(self, f, byte_range):
-        f.seek(byte_range.lower)
-        return f.read(byte_range.upper - byte_range.lower)
-
 
 file_handler = FileHandler()  # type: ignore
 
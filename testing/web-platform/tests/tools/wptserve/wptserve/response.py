@@ -1,6 +1,8 @@
 # mypy: allow-untyped-defs
 
 import json
+import os
+import ssl
 import uuid
 import traceback
 from collections import OrderedDict
@@ -216,6 +218,8 @@ class Response:
             for item in self.content:
                 if hasattr(item, "__call__"):
                     value = item()
+                elif read_file and hasattr(item, "read"):
+                    value = item.read()
                 else:
                     value = item
                 if value:
@@ -231,8 +235,14 @@ class Response:
     def write_content(self):
         """Write out the response content"""
         if self.request.method != "HEAD" or self.send_body_for_head_request:
-            for item in self.iter_content():
-                self.writer.write_content(item)
+            if hasattr(self.content, "read"):
+                # Hand file-like content straight to the writer so that it
+                # can be copied to the socket with os.sendfile() where the
+                # platform supports that.
+                self.writer.write_content_file(self.content)
+            else:
+                for item in self.iter_content():
+                    self.writer.write_content(item)
 
     def write(self):
         """Write the whole response"""
@@ -290,13 +300,8 @@ class MultipartContent:
         self.default_content_type = default_content_type
 
     def __call__(self):
-        boundary = b"--" + self.boundary.encode("ascii")
-        rv = [b"", boundary]
-        for item in self.items:
-            rv.append(item.to_bytes())
-            rv.append(boundary)
-        rv[-1] += b"--"
-        return b"\r\n".join(rv)
+        return b"".join(item if isinstance(item, bytes) else item.read()
+                        for item in self)
 
     def append_part(self, data, content_type=None, headers=None):
         if content_type is None:
@@ -304,16 +309,23 @@ class MultipartContent:
         self.items.append(MultipartPart(data, content_type, headers))
 
     def __iter__(self):
-        #This is hackish; when writing the response we need an iterable
-        #or a string. For a multipart/byterange response we want an
-        #iterable that contains a single callable; the MultipartContent
-        #object itself
-        yield self
+        """Yield the content as alternating bytes objects holding the
+        boundary and part headers, and the part bodies themselves, so that
+        file-backed part data can be streamed by the response writer rather
+        than concatenated in memory."""
+        boundary = b"--" + self.boundary.encode("ascii")
+        if not self.items:
+            yield b"\r\n" + boundary + b"--"
+            return
+        for item in self.items:
+            yield b"\r\n" + boundary + b"\r\n" + item.headers_bytes() + b"\r\n\r\n"
+            yield item.data
+        yield b"\r\n" + boundary + b"--"
 
 
 class MultipartPart:
     def __init__(self, data, content_type=None, headers=None):
-        assert isinstance(data, bytes), data
+        assert isinstance(data, bytes) or hasattr(data, "read"), data
         self.headers = ResponseHeaders()
 
         if content_type is not None:
@@ -329,17 +341,62 @@ class MultipartPart:
 
         self.data = data
 
-    def to_bytes(self):
+    def headers_bytes(self):
         rv = []
         for key, value in self.headers:
             assert isinstance(key, bytes)
             assert isinstance(value, bytes)
             rv.append(b"%s: %s" % (key, value))
-        rv.append(b"")
-        rv.append(self.data)
         return b"\r\n".join(rv)
 
 
+class FileSlice:
+    """File-like object exposing a byte range [lower, upper) of an open file.
+
+    The slice behaves as a file of length upper - lower, with tell() and
+    seek() relative to the start of the range, and the underlying file
+    object is left accessible so that ResponseWriter can pass the range to
+    os.sendfile() rather than copying it through user space. Several slices
+    may share a single file object (e.g. for a multipart range response);
+    reads always seek the file to the slice's own position first, and
+    close_file=False leaves closing the shared file to its owner."""
+    def __init__(self, f, lower, upper, close_file=True):
+        self._file = f
+        self._close_file = close_file
+        self.lower = lower
+        self.length = upper - lower
+        self._pos = 0
+
+    @property
+    def remaining(self):
+        return self.length - self._pos
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, pos, whence=0):
+        if whence == 1:
+            pos += self._pos
+        elif whence == 2:
+            pos += self.length
+        self._pos = max(0, min(pos, self.length))
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        self._file.seek(self.lower + self._pos)
+        data = self._file.read(size)
+        self._pos += len(data)
+        return data
+
+    def close(self):
+        if self._close_file:
+            self._file.close()
+
+
 def _maybe_encode(s):
     """Encode a string or an int into binary data using isomorphic_encode()."""
     if isinstance(s, int):
@@ -749,11 +806,17 @@ class ResponseWriter:
                 if not self.write_header(name, f()):
                     return False
 
-        if (isinstance(self._response.content, (bytes, str)) and
-            not self._seen_header("content-length")):
-            #Would be nice to avoid double-encoding here
-            if not self.write_header("Content-Length", len(self.encode(self._response.content))):
-                return False
+        if not self._seen_header("content-length"):
+            if isinstance(self._response.content, (bytes, str)):
+                #Would be nice to avoid double-encoding here
+                content_length = len(self.encode(self._response.content))
+            else:
+                # e.g. a FileSlice, which knows its length without the
+                # content having to be read into memory
+                content_length = getattr(self._response.content, "length", None)
+            if content_length is not None:
+                if not self.write_header("Content-Length", content_length):
+                    return False
 
         return True
 
@@ -816,8 +879,15 @@ class ResponseWriter:
             return False
 
     def write_content_file(self, data):
-        """Write a file-like object directly to the response in chunks."""
+        """Write a file-like object directly to the response.
+
+        Where the platform supports it, plain files are copied to the socket
+        in the kernel with os.sendfile(); otherwise the content is written
+        out in chunks."""
         self.content_written = True
+        if self._sendfile(data):
+            data.close()
+            return True
         success = True
         while True:
             buf = data.read(self.file_chunk_size)
@@ -832,6 +902,52 @@ class ResponseWriter:
         data.close()
         return success
 
+    def _sendfile(self, data):
+        """Try to copy a file to the socket with os.sendfile(), avoiding the
+        user-space copy of the chunked read/write loop.
+
+        Returns False without writing anything when the kernel copy isn't
+        available (no os.sendfile, a TLS socket, or content without a real
+        file descriptor), in which case the caller should fall back to
+        read/write."""
+        if not hasattr(os, "sendfile"):
+            return False
+        sock = self._handler.connection
+        if isinstance(sock, ssl.SSLSocket):
+            # TLS bytes have to pass through the SSL layer in user space
+            return False
+        try:
+            in_fd = data.fileno()
+        except (AttributeError, OSError, ValueError):
+            return False
+        if isinstance(data, FileSlice):
+            offset = data.lower + data.tell()
+            count = data.remaining
+        else:
+            offset = data.tell()
+            try:
+                count = os.fstat(in_fd).st_size - offset
+            except OSError:
+                return False
+        # Any previously buffered data (e.g. headers) must go out first so
+        # that it isn't reordered after the file content
+        self._wfile.flush()
+        sent = False
+        while count > 0:
+            try:
+                n = os.sendfile(sock.fileno(), in_fd, offset, count)
+            except OSError:
+                # Before anything is sent this indicates an input that the
+                # kernel can't sendfile (so fall back to read/write); after
+                # that it means the remote end closed the connection
+                return sent
+            if n == 0:
+                break
+            sent = True
+            offset += n
+            count -= n
+        return sent
+
     def encode(self, data):
         """Convert unicode to bytes according to response.encoding."""
         if isinstance(data, bytes):
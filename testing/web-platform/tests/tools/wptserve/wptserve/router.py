@@ -74,9 +74,17 @@ class RouteCompiler:
         self.star_seen = True
         return "(.*"
 
+_compiled_path_cache = {}
+
 def compile_path_match(route_pattern):
     """tokens: / or literal or match or *"""
 
+    # The same patterns (e.g. the default routes) get compiled once per
+    # server instance, so memoize the compiled regexps
+    rv = _compiled_path_cache.get(route_pattern)
+    if rv is not None:
+        return rv
+
     tokenizer = RouteTokenizer()
     tokens, unmatched = tokenizer.scan(route_pattern)
 
@@ -84,7 +92,8 @@ def compile_path_match(route_pattern):
 
     compiler = RouteCompiler()
 
-    return compiler.compile(tokens)
+    rv = _compiled_path_cache[route_pattern] = compiler.compile(tokens)
+    return rv
 
 class Router:
     """Object for matching handler functions to requests.
@@ -110,8 +119,7 @@ class Router:
         if self.doc_root not in sys.path:
             sys.path.insert(0, self.doc_root)
 
-        for route in reversed(routes):
-            self.register(*route)
+        self.register_many(reversed(routes))
 
     def register(self, methods, path, handler):
         r"""Register a handler for a set of paths.
@@ -153,6 +161,15 @@ class Router:
             self.routes.append((method, compile_path_match(path), handler))
             self.logger.debug("Route pattern: %s" % self.routes[-1][1].pattern)
 
+    def register_many(self, routes):
+        """Register a collection of routes in one call.
+
+        :param routes: Iterable of (methods, path_pattern, handler_function)
+                       tuples, each defined as for register()
+        """
+        for route in routes:
+            self.register(*route)
+
     def get_handler(self, request):
         """Get a handler for a request or None if there is no handler.
 